@@ -5,30 +5,93 @@ Supports multiple animation programs with real-time parameter control
 """
 
 import time
+import cmath
 import json
 import os
 import sys
 import threading
+from collections import deque
 import importlib.util
-from datetime import datetime
+import numpy as np
 import board
 import neopixel
 from config import Config
+from utils.color_utils import hsv_to_rgb_array
 from webgui.app import create_app
 
+# Which of (C+m, X+m, m) lands in R, G, B for each 60-degree hue sector
+_HSV_SECTORS = (
+    (0, 1, 2),
+    (1, 0, 2),
+    (2, 0, 1),
+    (2, 1, 0),
+    (1, 2, 0),
+    (0, 2, 1),
+)
+
+# Resolution of the baked (hue, value) color table
+HSV_HUE_BINS = 256
+HSV_VALUE_BINS = 32
+
+# Hue is carried as a 32-bit fraction of a full turn, so it wraps for free
+# in uint32 and the top 8 bits are the hue table bin
+HUE_TURN = 1 << 32
+HUE_BIN_SHIFT = 24
+
+# Stats are written beside STATS_PATH and swapped in, so readers never see a partial file
+STATS_PATH = '/tmp/cosmic_stats.json'
+STATS_TMP_PATH = STATS_PATH + '.tmp'
+STATS_TEMPLATE = (
+    b'{"fps": %.1f, "frame_count": %d, "uptime": %d, '
+    b'"current_program": %s, "last_update": %d}'
+)
+
+
+class PixelBuffer:
+    """LED frame held as a contiguous uint8 (N, 3) RGB array
+    
+    Vectorized programs write ``pixels.np`` directly; item access keeps the
+    ``pixels[i] = (r, g, b)`` interface older scripts use.
+    """
+    
+    def __init__(self, count):
+        self.np = np.zeros((count, 3), dtype=np.uint8)
+    
+    def __len__(self):
+        return len(self.np)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [tuple(color) for color in self.np[index].tolist()]
+        return tuple(self.np[index].tolist())
+    
+    def __setitem__(self, index, color):
+        if isinstance(color, int):
+            # Packed 0xRRGGBB, as NeoPixel accepts
+            color = ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+        self.np[index] = color
+    
+    def fill(self, color):
+        self[:] = color
+
+
 class CosmicLED:
     def __init__(self):
         self.config = Config()
         self.running = True
         self.current_program = "cosmic"
         self.programs = {}
-        self.stats = {
+        self._animate = None
+        # The animation loop writes the front dict; self.stats is the snapshot
+        # the web UI reads, replaced wholesale once per second
+        self._stats_front = {
             "fps": 0,
             "frame_count": 0,
             "uptime": 0,
             "current_program": self.current_program,
-            "last_update": datetime.now().isoformat()
+            "last_update": int(time.time())
         }
+        self.stats = dict(self._stats_front)
         
         # Initialize LED strip
         self.pixels = neopixel.NeoPixel(
@@ -39,6 +102,30 @@ class CosmicLED:
             pixel_order=neopixel.GRB
         )
         
+        # Frame that programs render into; pushed to the strip each frame
+        self.frame = PixelBuffer(self.config.LED_COUNT)
+        
+        # Frames go straight into the pixelbuf's wire buffer when its private
+        # internals are there; otherwise they go through the public API
+        self._direct_tx = all(
+            hasattr(self.pixels, name)
+            for name in ('_transmit', '_post_brightness_buffer', '_offset', '_byteorder')
+        )
+        
+        # Column order that turns an RGB frame into the strip's wire order
+        self._wire_order = np.argsort(self.pixels._byteorder[:3]) if self._direct_tx else None
+        
+        # Lookup tables (rebuilt when GAMMA/BRIGHTNESS change)
+        self._brightness_lut = self._build_brightness_lut()
+        self._gamma_lut = self._build_gamma_lut()
+        self._hsv_lut = self._build_hsv_lut()
+        
+        # Per-pixel tables for the vectorized cosmic animation
+        self._brightness_rot = np.exp(1j * 0.1 * np.arange(self.config.LED_COUNT))
+        self._hue_offsets = (
+            np.arange(self.config.LED_COUNT, dtype=np.uint64) * HUE_TURN // self.config.LED_COUNT
+        ).astype(np.uint32)
+        
         # Load available programs
         self.load_programs()
         
@@ -46,6 +133,18 @@ class CosmicLED:
         self.stats_thread = threading.Thread(target=self.stats_writer, daemon=True)
         self.stats_thread.start()
         
+        # Transmit worker state; two frame copies so the next frame can be
+        # rendered while the previous one is still going out on the wire
+        self._tx_bufs = None
+        if self._direct_tx:
+            self._tx_bufs = [bytearray(self.pixels._post_brightness_buffer) for _ in range(2)]
+        self._tx_index = 0
+        self._tx_pending = None
+        self._tx_ready = threading.Event()
+        self._tx_done = threading.Event()
+        self._tx_done.set()
+        self._tx_thread = None
+        
     def load_programs(self):
         """Load all animation programs from scripts folder"""
         scripts_dir = os.path.join(os.path.dirname(__file__), 'scripts')
@@ -53,14 +152,19 @@ class CosmicLED:
         # Built-in cosmic animation
         self.programs['cosmic'] = self.cosmic_animation
         
-        # Load external scripts
+        # Load external scripts by path under a "scripts." name, kept out of
+        # sys.path and sys.modules so a script named like a stdlib or project
+        # module can't shadow or reload it. The source loader still caches
+        # bytecode in scripts/__pycache__ between boots
         if os.path.exists(scripts_dir):
             for filename in os.listdir(scripts_dir):
-                if filename.endswith('.py') and not filename.startswith('__'):
+                if filename.endswith('.py') and not filename.startswith('_'):
                     program_name = filename[:-3]
+                    module_name = f"scripts.{program_name}"
                     try:
+                        # A fresh module each load picks up scripts edited since the last one
                         spec = importlib.util.spec_from_file_location(
-                            program_name, 
+                            module_name,
                             os.path.join(scripts_dir, filename)
                         )
                         module = importlib.util.module_from_spec(spec)
@@ -71,48 +175,93 @@ class CosmicLED:
                             print(f"Loaded program: {program_name}")
                     except Exception as e:
                         print(f"Error loading {filename}: {e}")
+        
+        # Re-resolve the active program so a reload picks up the new function
+        self._animate = self.programs.get(self.current_program)
+    
+    def _build_brightness_lut(self):
+        """Build the 256-entry BRIGHTNESS scale applied when a frame is pushed"""
+        brightness = min(max(self.config.BRIGHTNESS, 0.0), 1.0)
+        return np.array([int(i * brightness) for i in range(256)], dtype=np.uint8)
+    
+    def _build_gamma_lut(self):
+        """Build a 256-entry gamma lookup table"""
+        brightness = self.config.BRIGHTNESS
+        gamma = self.config.GAMMA
+        return bytes(
+            min(255, int(255 * pow(i * brightness / 255, gamma)))
+            for i in range(256)
+        )
+    
+    def _build_hsv_lut(self):
+        """Bake HSV to RGB, brightness and gamma into a (hue, value) color table"""
+        hue = np.arange(HSV_HUE_BINS) / HSV_HUE_BINS
+        value = np.arange(HSV_VALUE_BINS) / (HSV_VALUE_BINS - 1)
+        rgb = hsv_to_rgb_array(hue[:, np.newaxis], 1.0, value[np.newaxis, :])
+        return np.frombuffer(self._gamma_lut, dtype=np.uint8)[rgb]
     
     def cosmic_animation(self, pixels, config, frame):
         """Default cosmic animation with flowing colors"""
-        import math
+        # Create flowing wave pattern in fixed point; integer ops only per pixel
+        speed_fp = int(round(config.SPEED * HUE_TURN / 360))
+        hue_fp = self._hue_offsets + np.uint32((frame * speed_fp) & (HUE_TURN - 1))
+        h_idx = hue_fp >> HUE_BIN_SHIFT
         
-        for i in range(config.LED_COUNT):
-            # Create flowing wave pattern
-            hue = (frame * config.SPEED + i * 360 / config.LED_COUNT) % 360
-            
-            # Add some variation
-            brightness_mod = (math.sin(frame * 0.01 + i * 0.1) + 1) / 2
-            brightness = config.BRIGHTNESS * brightness_mod
-            
-            # Convert HSV to RGB
-            rgb = self.hsv_to_rgb(hue / 360, 1.0, brightness)
-            
-            # Apply gamma correction
-            rgb = tuple(int(self.gamma_correct(c, config.GAMMA)) for c in rgb)
-            
-            pixels[i] = rgb
+        # Add some variation: sin(a + k*b) is Im(e^(ja) * e^(jkb)), so one
+        # scalar exp per frame rotates the precomputed per-pixel phasors
+        phasor = cmath.exp(1j * ((frame * 0.01) % (2 * np.pi))) * self._brightness_rot
+        brightness_mod = (phasor.imag + 1) * 0.5
+        
+        # Quantize to table bins; one gather yields the finished colors
+        v_idx = (brightness_mod * (HSV_VALUE_BINS - 1) + 0.5).astype(np.intp)
+        pixels.np[:] = self._hsv_lut[h_idx, v_idx]
             
     def hsv_to_rgb(self, h, s, v):
         """Convert HSV to RGB color space"""
-        import colorsys
-        rgb = colorsys.hsv_to_rgb(h, s, v)
-        return tuple(int(c * 255) for c in rgb)
-    
-    def gamma_correct(self, value, gamma):
-        """Apply gamma correction to color value"""
-        return 255 * pow(value / 255, gamma)
+        h6 = (h % 1.0) * 6
+        sector = int(h6) % 6
+        c = v * s
+        x = c * (1 - abs(h6 % 2 - 1))
+        m = v - c
+        
+        vals = (int((c + m) * 255), int((x + m) * 255), int(m * 255))
+        r, g, b = _HSV_SECTORS[sector]
+        return (vals[r], vals[g], vals[b])
     
     def stats_writer(self):
-        """Write runtime stats to JSON file"""
-        start_time = time.time()
+        """Publish a stats snapshot and write it to the stats file when frames advance"""
+        start_time = time.monotonic()
+        last_frame = -1
+        program = None
+        program_json = b'""'
         
         while self.running:
-            self.stats["uptime"] = int(time.time() - start_time)
-            self.stats["last_update"] = datetime.now().isoformat()
+            front = self._stats_front
+            frame_count = front["frame_count"]
+            if frame_count == last_frame:
+                time.sleep(1)
+                continue
+            last_frame = frame_count
+            
+            front["uptime"] = int(time.monotonic() - start_time)
+            front["last_update"] = int(time.time())
+            # Readers only ever see a whole dict; rebinding the attribute is atomic
+            snapshot = dict(front)
+            self.stats = snapshot
+            
+            # Only the program name needs JSON escaping; re-encode it on change
+            if snapshot["current_program"] != program:
+                program = snapshot["current_program"]
+                program_json = json.dumps(program).encode()
             
             try:
-                with open('/tmp/cosmic_stats.json', 'w') as f:
-                    json.dump(self.stats, f)
+                data = STATS_TEMPLATE % (
+                    snapshot["fps"], frame_count, snapshot["uptime"],
+                    program_json, snapshot["last_update"]
+                )
+                with open(STATS_TMP_PATH, 'wb') as f:
+                    f.write(data)
+                os.replace(STATS_TMP_PATH, STATS_PATH)
             except Exception as e:
                 print(f"Error writing stats: {e}")
                 
@@ -122,7 +271,8 @@ class CosmicLED:
         """Switch to a different animation program"""
         if program_name in self.programs:
             self.current_program = program_name
-            self.stats["current_program"] = program_name
+            self._stats_front["current_program"] = program_name
+            self._animate = self.programs[program_name]
             return True
         return False
     
@@ -131,49 +281,117 @@ class CosmicLED:
         for key, value in new_config.items():
             if hasattr(self.config, key):
                 setattr(self.config, key, value)
+        
+        # Rebuild color tables if their inputs changed
+        if "GAMMA" in new_config or "BRIGHTNESS" in new_config:
+            self._brightness_lut = self._build_brightness_lut()
+            self._gamma_lut = self._build_gamma_lut()
+            self._hsv_lut = self._build_hsv_lut()
                 
         # Update pixel brightness
         self.pixels.brightness = self.config.BRIGHTNESS
     
+    def _show_worker(self):
+        """Transmit handed-off frames so show() overlaps the next frame's compute"""
+        while True:
+            self._tx_ready.wait()
+            self._tx_ready.clear()
+            buf = self._tx_pending
+            if buf is None:
+                break
+            try:
+                if self._direct_tx:
+                    self.pixels._transmit(buf)
+                else:
+                    self.pixels.show()
+            except Exception as e:
+                print(f"Error showing pixels: {e}")
+            finally:
+                self._tx_done.set()
+    
+    def _present(self):
+        """Scale the frame into wire order and hand it to the transmit worker"""
+        if not self._direct_tx:
+            self._present_fallback()
+            return
+        
+        buf = self._tx_bufs[self._tx_index]
+        wire = self._brightness_lut[self.frame.np[:, self._wire_order]]
+        start = self.pixels._offset
+        buf[start:start + wire.nbytes] = wire.tobytes()
+        # Only one frame in flight; the other buffer may still be on the wire
+        self._tx_done.wait()
+        self._tx_done.clear()
+        self._tx_pending = buf
+        self._tx_ready.set()
+        self._tx_index ^= 1
+    
+    def _present_fallback(self):
+        """Hand the frame to the pixelbuf's public API, which scales and orders it"""
+        self._tx_done.wait()
+        self.pixels[:] = list(map(tuple, self.frame.np.tolist()))
+        self._tx_done.clear()
+        self._tx_pending = b''  # Any non-None value; the worker calls show()
+        self._tx_ready.set()
+    
+    def _stop_show_worker(self):
+        """Let the in-flight frame finish, then stop the transmit worker"""
+        if self._tx_thread is None:
+            return
+        self._tx_done.wait()
+        self._tx_pending = None
+        self._tx_ready.set()
+        self._tx_thread.join()
+        self._tx_thread = None
+    
     def run(self):
         """Main animation loop"""
         frame = 0
-        last_time = time.time()
-        frame_times = []
+        frame_period = 1 / 60  # 60 FPS target
+        last_time = time.monotonic()
+        frame_times = deque(maxlen=30)
+        pixels = self.frame
+        config = self.config
+        stats = self._stats_front
+        next_deadline = time.monotonic() + frame_period
+        
+        self._tx_thread = threading.Thread(target=self._show_worker, daemon=True)
+        self._tx_thread.start()
         
         try:
             while self.running:
-                frame_start = time.time()
+                frame_start = time.monotonic()
                 
-                # Run current animation program
-                if self.current_program in self.programs:
-                    self.programs[self.current_program](
-                        self.pixels, self.config, frame
-                    )
+                # Run current animation program; switch_program/load_programs
+                # swap the resolved function, so no dict lookup per frame
+                animate = self._animate
+                if animate is not None:
+                    animate(pixels, config, frame)
                 
-                # Show the pixels
-                self.pixels.show()
+                # Show the pixels from the transmit worker
+                self._present()
                 
                 # Calculate FPS
-                frame_time = time.time() - frame_start
-                frame_times.append(frame_time)
-                
-                if len(frame_times) > 30:
-                    frame_times.pop(0)
+                now = time.monotonic()
+                frame_times.append(now - frame_start)
                     
-                if time.time() - last_time > 1:
+                if now - last_time > 1:
                     avg_frame_time = sum(frame_times) / len(frame_times)
-                    self.stats["fps"] = round(1 / avg_frame_time, 1) if avg_frame_time > 0 else 0
-                    last_time = time.time()
+                    stats["fps"] = round(1 / avg_frame_time, 1) if avg_frame_time > 0 else 0
+                    last_time = now
                 
-                self.stats["frame_count"] = frame
+                stats["frame_count"] = frame
                 frame += 1
                 
-                # Frame rate limiting
-                target_frame_time = 1 / 60  # 60 FPS target
-                sleep_time = target_frame_time - frame_time
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
+                # Frame rate limiting against an absolute deadline, so a late
+                # frame doesn't push every following frame back
+                delay = next_deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                    next_deadline += frame_period
+                else:
+                    # Too far behind to catch up; restart the schedule from now
+                    next_deadline = time.monotonic() + frame_period
                     
         except KeyboardInterrupt:
             print("\nShutting down...")
@@ -183,6 +401,7 @@ class CosmicLED:
     def cleanup(self):
         """Clean up resources"""
         self.running = False
+        self._stop_show_worker()
         self.pixels.fill((0, 0, 0))
         self.pixels.show()
         self.pixels.deinit()
@@ -26,8 +26,8 @@ print("\nCreating test animation...")
 
 test_code = '''#!/usr/bin/env python3
 from rgbmatrix import RGBMatrix, RGBMatrixOptions
-import time
-import math
+from PIL import Image
+import numpy as np
 
 # Setup
 options = RGBMatrixOptions()
@@ -43,20 +43,21 @@ options.pwm_bits = 11
 matrix = RGBMatrix(options=options)
 canvas = matrix.CreateFrameCanvas()
 
+# Pixel coordinates for the whole panel, indexed [y, x]
+xs, ys = np.meshgrid(np.arange(64), np.arange(64))
+
 print("Running smooth test... Press Ctrl+C to stop")
 frame = 0
 try:
     while True:
-        for x in range(64):
-            for y in range(64):
-                hue = ((x + y) / 128.0 + math.sin(frame * 0.01) * 0.2) * 6
-                if hue < 1: r, g, b = 1, hue, 0
-                elif hue < 2: r, g, b = 2-hue, 1, 0
-                elif hue < 3: r, g, b = 0, 1, hue-2
-                elif hue < 4: r, g, b = 0, 4-hue, 1
-                elif hue < 5: r, g, b = hue-4, 0, 1
-                else: r, g, b = 1, 0, 6-hue
-                canvas.SetPixel(x, y, int(r*255), int(g*255), int(b*255))
+        hue = ((xs + ys) / 128.0 + np.sin(frame * 0.01) * 0.2) * 6
+        sectors = [hue < 1, hue < 2, hue < 3, hue < 4, hue < 5]
+        r = np.select(sectors, [1, 2 - hue, 0, 0, hue - 4], 1)
+        g = np.select(sectors, [hue, 1, 1, 4 - hue, 0], 0)
+        b = np.select(sectors, [0, 0, hue - 2, 1, 1], 6 - hue)
+        frame_rgb = (np.clip(np.stack([r, g, b], -1), 0, 1) * 255).astype(np.uint8)
+        # One SetImage copies the frame instead of 4096 SetPixel calls
+        canvas.SetImage(Image.fromarray(frame_rgb))
         canvas = matrix.SwapOnVSync(canvas)
         frame += 1
 except KeyboardInterrupt:
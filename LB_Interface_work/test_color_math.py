@@ -2,35 +2,33 @@
 """Test the color calculations before deploying"""
 
 import math
+import numpy as np
 
-# Test the color calculation
-frame = 0
-errors = []
+# Test the color calculation over every sampled (frame, x, y) at once
+frames = np.arange(100)[:, None, None]
+xs = np.arange(0, 64, 10)[None, :, None]  # Sample some pixels
+ys = np.arange(0, 64, 10)[None, None, :]
+hue = ((xs + ys) / 128.0 + np.sin(frames * 0.01) * 0.2) * 6
+
+# Original broken code
+sectors = [hue < 1, hue < 2, hue < 3, hue < 4, hue < 5]
+r = np.select(sectors, [1, 2 - hue, 0, 0, hue - 4], 1)
+g = np.select(sectors, [hue, 1, 1, 4 - hue, 0], 0)
+b = np.select(sectors, [0, 0, hue - 2, 1, 1], 6 - hue)
 
-for frame in range(100):
-    for x in range(0, 64, 10):  # Sample some pixels
-        for y in range(0, 64, 10):
-            hue = ((x + y) / 128.0 + math.sin(frame * 0.01) * 0.2) * 6
-            
-            # Original broken code
-            try:
-                if hue < 1: r, g, b = 1, hue, 0
-                elif hue < 2: r, g, b = 2-hue, 1, 0
-                elif hue < 3: r, g, b = 0, 1, hue-2
-                elif hue < 4: r, g, b = 0, 4-hue, 1
-                elif hue < 5: r, g, b = hue-4, 0, 1
-                else: r, g, b = 1, 0, 6-hue
-                
-                # Check for negative values
-                if r < 0 or g < 0 or b < 0:
-                    errors.append(f"Negative at frame {frame}, x={x}, y={y}: r={r}, g={g}, b={b}, hue={hue}")
-                
-                # Check for values > 1
-                if r > 1 or g > 1 or b > 1:
-                    errors.append(f"Too large at frame {frame}, x={x}, y={y}: r={r}, g={g}, b={b}, hue={hue}")
-                    
-            except Exception as e:
-                errors.append(f"Error at frame {frame}, x={x}, y={y}: {e}")
+negative = (r < 0) | (g < 0) | (b < 0)
+too_large = (r > 1) | (g > 1) | (b > 1)
+
+errors = []
+for f, i, j in np.argwhere(negative | too_large):
+    x, y = int(xs[0, i, 0]), int(ys[0, 0, j])
+    rgb = f"r={r[f, i, j]}, g={g[f, i, j]}, b={b[f, i, j]}, hue={hue[f, i, j]}"
+    # Check for negative values
+    if negative[f, i, j]:
+        errors.append(f"Negative at frame {f}, x={x}, y={y}: {rgb}")
+    # Check for values > 1
+    if too_large[f, i, j]:
+        errors.append(f"Too large at frame {f}, x={x}, y={y}: {rgb}")
 
 print(f"Found {len(errors)} errors")
 if errors:
@@ -4,7 +4,100 @@ This is the default animation that creates smooth color flows.
 """
 
 import math
-from typing import List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.color_utils import hsv_to_rgb_array
+
+# Animation parameters
+WAVE_SPEED = 0.05
+COLOR_SPEED = 0.02
+WAVE_SCALE = 0.3
+
+# Spatial sin/cos tables, keyed on (width, height, wave_scale)
+_wave_tables: Dict[Tuple[int, int, float], Tuple[np.ndarray, ...]] = {}
+
+# Renderer specialized for the current geometry and pixel container:
+# (index_map, num_pixels, is_array, render)
+_renderer: Optional[Tuple[np.ndarray, int, bool, Callable]] = None
+
+# Frame body with the geometry, pixel count and animation constants baked in
+_RENDER_TEMPLATE = """
+def render(pixels, frame, speed, brightness, gamma):
+    t = frame * ({wave_speed!r} * speed)
+    sin_t = _sin(t)
+    cos_t = _cos(t)
+    wave_x = (sin_t * cos_x + cos_t * sin_x) * 0.5 + 0.5
+    wave_y = (cos_t * cos_y - sin_t * sin_y) * 0.5 + 0.5
+    combined = (wave_x[np.newaxis, :] + wave_y[:, np.newaxis]) * 0.5
+    hue = (combined + (frame * ({color_speed!r} * speed)) % 1.0) % 1.0
+    rgb = gamma[hsv_to_rgb_array(hue, 1.0, brightness)].reshape({num_cells}, 3)
+    {buffer_init}
+    buf[dst] = rgb[src]
+    {writeback}
+"""
+
+
+def _get_wave_tables(width: int, height: int, wave_scale: float) -> Tuple[np.ndarray, ...]:
+    """Get sin/cos of the per-column and per-row phase offsets (frame-invariant)."""
+    key = (width, height, wave_scale)
+    tables = _wave_tables.get(key)
+    if tables is None:
+        x_phase = np.arange(width) * wave_scale
+        y_phase = np.arange(height) * wave_scale
+        tables = (np.sin(x_phase), np.cos(x_phase), np.sin(y_phase), np.cos(y_phase))
+        # Geometry or scale changed - drop stale tables
+        _wave_tables.clear()
+        _wave_tables[key] = tables
+    return tables
+
+
+def _build_renderer(index_map: np.ndarray, num_pixels: int, is_array: bool = False) -> Callable:
+    """Generate a render function specialized for one matrix geometry.
+    
+    When is_array is set, pixels is an (num_pixels, 3) uint8 ndarray that is
+    written in place instead of a list of RGB tuples.
+    """
+    height, width = index_map.shape
+    sin_x, cos_x, sin_y, cos_y = _get_wave_tables(width, height, WAVE_SCALE)
+    
+    # Resolve the xy mapping to flat source/destination indices once
+    flat = index_map.ravel()
+    src = np.flatnonzero((flat >= 0) & (flat < num_pixels))
+    dst = flat[src]
+    
+    # When every pixel is written, the previous contents never need reading
+    writeback = "pixels[:] = map(tuple, buf.tolist())"
+    if is_array:
+        buffer_init = "buf = pixels"
+        writeback = ""
+    elif np.unique(dst).size == num_pixels:
+        buffer_init = f"buf = np.empty(({num_pixels}, 3), dtype=np.uint8)"
+    else:
+        buffer_init = f"buf = np.array(pixels, dtype=np.uint8).reshape({num_pixels}, 3)"
+    
+    source = _RENDER_TEMPLATE.format(
+        wave_speed=WAVE_SPEED,
+        color_speed=COLOR_SPEED,
+        num_cells=width * height,
+        buffer_init=buffer_init,
+        writeback=writeback,
+    )
+    namespace = {
+        "np": np,
+        "hsv_to_rgb_array": hsv_to_rgb_array,
+        "_sin": math.sin,
+        "_cos": math.cos,
+        "sin_x": sin_x,
+        "cos_x": cos_x,
+        "sin_y": sin_y,
+        "cos_y": cos_y,
+        "src": src,
+        "dst": dst,
+    }
+    exec(compile(source, f"<cosmic {width}x{height}>", "exec"), namespace)
+    return namespace["render"]
 
 
 def animate(pixels: List[Tuple[int, int, int]], config, frame: int):
@@ -12,50 +105,28 @@ def animate(pixels: List[Tuple[int, int, int]], config, frame: int):
     Cosmic animation with flowing colors.
     
     Args:
-        pixels: List of RGB tuples to modify
+        pixels: List of RGB tuples, or an (N, 3) uint8 ndarray, to modify
         config: Configuration object with settings and optimizations
         frame: Current frame number
     """
+    global _renderer
+    
     # Get configuration values
     speed = config.get("speed", 1.0)
     brightness = config.get("brightness", 0.8)
     
-    # Get dimensions based on matrix type
-    if config.get("matrix_type") == "hub75":
-        width = config.get("hub75.cols", 64)
-        height = config.get("hub75.rows", 64)
-    else:
-        width = config.get("ws2811.width", 10)
-        height = config.get("ws2811.height", 10)
-    
-    # Animation parameters
-    wave_speed = 0.05 * speed
-    color_speed = 0.02 * speed
-    wave_scale = 0.3
-    
-    # Current time for animation
-    t = frame * wave_speed
+    # The index map is rebuilt by config whenever matrix type or geometry
+    # changes, so its identity tells us when to re-specialize
+    index_map = config.xy_index_map
+    num_pixels = len(pixels)
+    is_array = isinstance(pixels, np.ndarray)
+    if (_renderer is None or _renderer[0] is not index_map
+            or _renderer[1] != num_pixels or _renderer[2] != is_array):
+        _renderer = (index_map, num_pixels, is_array,
+                     _build_renderer(index_map, num_pixels, is_array))
     
-    # Generate flowing pattern
-    for y in range(height):
-        for x in range(width):
-            # Calculate wave offset
-            wave_x = math.sin(t + x * wave_scale) * 0.5 + 0.5
-            wave_y = math.cos(t + y * wave_scale) * 0.5 + 0.5
-            
-            # Combine waves for more complex pattern
-            combined = (wave_x + wave_y) * 0.5
-            
-            # Color cycling
-            hue = (combined + frame * color_speed) % 1.0
-            
-            # Convert HSV to RGB using config's optimized method
-            r, g, b = config.hsv_to_rgb(hue, 1.0, brightness)
-            
-            # Set pixel using config's mapping
-            idx = config.xy_to_index(x, y)
-            if 0 <= idx < len(pixels):
-                pixels[idx] = (r, g, b)
+    gamma = np.asarray(config._gamma_table, dtype=np.uint8)
+    _renderer[3](pixels, frame, speed, brightness, gamma)
 
 
 # Animation parameters that can be configured
@@ -6,6 +6,11 @@ Provides default settings and palette definitions
 import json
 import os
 
+import numpy as np
+
+# Entries in the sampled palette table
+PALETTE_LUT_SIZE = 1024
+
 class Config:
     """Configuration class for LED animations"""
     
@@ -88,6 +93,8 @@ class Config:
     def __init__(self):
         """Initialize configuration with saved settings if available"""
         self.settings_file = "settings.json"
+        self._cache = {}  # name -> (params, value) for derived lookup tables
+        self._scratch = {}  # name -> reusable per-frame work array
         self.load_settings()
     
     def load_settings(self):
@@ -127,6 +134,25 @@ class Config:
             print(f"Error saving settings: {e}")
             return False
     
+    def _cached(self, name, params, build):
+        """Return a derived table, rebuilding it only when its params change"""
+        entry = self._cache.get(name)
+        if entry is None or entry[0] != params:
+            entry = (params, build())
+            self._cache[name] = entry
+        return entry[1]
+    
+    def get_gamma_lut(self, brightness=1.0, intensity=1.0):
+        """Get a 256-entry table mapping a color channel to its scaled, gamma corrected value"""
+        gamma = self.GAMMA
+        return self._cached(
+            "gamma_lut", (brightness, intensity, gamma),
+            lambda: bytes(
+                int(255 * pow(min(255, int(v * brightness * intensity)) / 255, gamma))
+                for v in range(256)
+            )
+        )
+    
     def get_palette_colors(self):
         """Get colors from current palette"""
         return self.PALETTES.get(self.CURRENT_PALETTE, self.PALETTES["rainbow"])
@@ -156,6 +182,145 @@ class Config:
         
         return (r, g, b)
     
+    def _build_palette_lut(self):
+        """Sample interpolate_palette at PALETTE_LUT_SIZE evenly spaced positions"""
+        last = PALETTE_LUT_SIZE - 1
+        return np.array(
+            [self.interpolate_palette(i / last) for i in range(PALETTE_LUT_SIZE)],
+            dtype=np.uint8
+        ).reshape(PALETTE_LUT_SIZE, 3)
+    
+    @property
+    def palette_lut(self):
+        """Current palette as a (PALETTE_LUT_SIZE, 3) uint8 table indexed by int(position * 1023)"""
+        colors = tuple(map(tuple, self.get_palette_colors()))
+        return self._cached("palette_lut", colors, self._build_palette_lut)
+    
+    @property
+    def rng(self):
+        """Shared NumPy random generator for animations"""
+        return self._cached("rng", None, np.random.default_rng)
+    
+    def build_final_lut(self):
+        """Fuse palette, BRIGHTNESS, INTENSITY and gamma into one (PALETTE_LUT_SIZE, 3) table"""
+        gamma_lut = np.frombuffer(self.get_gamma_lut(self.BRIGHTNESS, self.INTENSITY), dtype=np.uint8)
+        return gamma_lut[self.palette_lut]
+    
+    @property
+    def final_lut(self):
+        """Finished output color for every palette position, indexed like palette_lut"""
+        params = (
+            tuple(map(tuple, self.get_palette_colors())),
+            self.BRIGHTNESS, self.INTENSITY, self.GAMMA
+        )
+        return self._cached("final_lut", params, self.build_final_lut)
+    
+    def get_scratch(self, name, shape, dtype=np.float64):
+        """Get a reusable work array, reallocated only when its shape or dtype changes"""
+        buf = self._scratch.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._scratch[name] = buf
+        return buf
+    
+    def get_xy_grid(self):
+        """Get (X, Y) coordinate grids of shape (MATRIX_HEIGHT, MATRIX_WIDTH)"""
+        width, height = self.MATRIX_WIDTH, self.MATRIX_HEIGHT
+        return self._cached(
+            "xy_grid", (width, height),
+            lambda: np.meshgrid(np.arange(width), np.arange(height))
+        )
+    
+    @property
+    def distance_map(self):
+        """Distance of every (y, x) pixel center from the matrix center, shape (MATRIX_HEIGHT, MATRIX_WIDTH)"""
+        width, height = self.MATRIX_WIDTH, self.MATRIX_HEIGHT
+        
+        def build():
+            x, y = self.get_xy_grid()
+            dx = np.abs(x - width / 2 + 0.5)
+            dy = np.abs(y - height / 2 + 0.5)
+            return np.sqrt(dx * dx + dy * dy)
+        
+        return self._cached("distance_map", (width, height), build)
+    
+    def _build_index_maps(self):
+        """Build the (H, W) LED index map (-1 where unmapped) plus flat view and mask"""
+        idx_map = np.full((self.MATRIX_HEIGHT, self.MATRIX_WIDTH), -1, dtype=np.int32)
+        for y in range(self.MATRIX_HEIGHT):
+            for x in range(self.MATRIX_WIDTH):
+                i = self.xy_to_index(x, y)
+                if i is not None and i < self.LED_COUNT:
+                    idx_map[y, x] = i
+        idx_map_flat = idx_map.ravel()
+        valid_mask = idx_map_flat >= 0
+        
+        # LED-order permutation of the valid grid cells for write_grid
+        cells = np.flatnonzero(valid_mask)
+        order = cells[np.argsort(idx_map_flat[cells], kind="stable")]
+        dest = idx_map_flat[order]
+        contiguous = bool(np.array_equal(dest, np.arange(len(dest))))
+        return idx_map, idx_map_flat, valid_mask, (order, dest, contiguous)
+    
+    def _index_maps(self):
+        return self._cached(
+            "index_maps",
+            (self.MATRIX_WIDTH, self.MATRIX_HEIGHT, self.SERPENTINE, self.LED_COUNT),
+            self._build_index_maps
+        )
+    
+    @property
+    def idx_map(self):
+        """LED index for every (y, x) as an int32 (MATRIX_HEIGHT, MATRIX_WIDTH) array, -1 if unmapped"""
+        return self._index_maps()[0]
+    
+    @property
+    def idx_map_flat(self):
+        """idx_map flattened in row-major grid order"""
+        return self._index_maps()[1]
+    
+    @property
+    def valid_mask(self):
+        """Boolean mask of idx_map_flat entries that address a real LED"""
+        return self._index_maps()[2]
+    
+    def apply_lut(self, pixels_arr, lut):
+        """Map a uint8 (N, 3) pixel array through a channel LUT in place
+
+        lut is a 256-entry table shared by all channels (bytes or array),
+        or a (256, 3) array with one column per channel.
+        """
+        if not isinstance(lut, np.ndarray):
+            lut = np.frombuffer(lut, dtype=np.uint8)
+        if lut.ndim == 1:
+            np.take(lut, pixels_arr, out=pixels_arr)
+        else:
+            pixels_arr[...] = lut[pixels_arr, np.arange(pixels_arr.shape[-1])]
+        return pixels_arr
+
+    def write_grid(self, pixels, colors):
+        """Write an (MATRIX_HEIGHT, MATRIX_WIDTH, 3) color grid to pixels in wiring order"""
+        order, dest, contiguous = self._index_maps()[3]
+        colors = colors.reshape(-1, 3)
+        
+        # Array-backed frames take the whole grid in one gather/scatter
+        target = getattr(pixels, "np", None)
+        if target is not None:
+            if contiguous:
+                np.take(colors, order, axis=0, out=target[:len(order)])
+            else:
+                target[dest] = colors[order]
+            return
+        
+        frame = colors[order]
+        rows = list(map(tuple, frame.tolist()))
+        if contiguous:
+            # One slice assignment when the grid covers LEDs 0..n-1
+            pixels[0:len(rows)] = rows
+        else:
+            for i, color in zip(dest.tolist(), rows):
+                pixels[i] = color
+    
     def xy_to_index(self, x, y):
         """Convert x,y coordinates to LED index for serpentine wiring"""
         if x < 0 or x >= self.MATRIX_WIDTH or y < 0 or y >= self.MATRIX_HEIGHT:
@@ -215,9 +215,6 @@ class Conductor:
         
         while self.running:
             try:
-                # Start frame timing
-                self.performance.frame_start()
-                
                 if not self._paused and self.current_animation:
                     # Run animation
                     self.current_animation.animate(
@@ -233,8 +230,8 @@ class Conductor:
                 # Frame rate limiting
                 self._frame_limiter.limit()
                 
-                # Update performance metrics
-                self.performance.frame_end()
+                # Update performance metrics (one tick per frame period)
+                self.performance.tick()
                 
                 # Process hardware events
                 if self.hardware:
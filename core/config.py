@@ -11,10 +11,28 @@ from typing import Dict, List, Tuple, Optional, Any
 from pathlib import Path
 import logging
 from functools import lru_cache
+from dataclasses import dataclass
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class MatrixPreset:
+    """Geometry and frame rate applied together when switching matrix type."""
+    width: int
+    height: int
+    fps: int
+    serpentine: bool
+
+
+MATRIX_PRESETS = {
+    "hub75": MatrixPreset(width=64, height=64, fps=30, serpentine=False),
+    "ws2811": MatrixPreset(width=10, height=10, fps=15, serpentine=True),
+}
+
+
 class ConfigManager:
     """Centralized configuration with caching and performance optimizations."""
     
@@ -75,6 +93,7 @@ class ConfigManager:
         # Performance optimizations
         self._gamma_table = self._build_gamma_table()
         self._serpentine_map = self._build_serpentine_map()
+        self._xy_index_map = None  # Built lazily by xy_index_map
         self._color_cache = {}  # LRU cache for color conversions
         self._cache_size = self._config.get("performance", {}).get("cache_size", 1000)
         
@@ -245,6 +264,35 @@ class ConfigManager:
             self._gamma_table = self._build_gamma_table()
         elif key.startswith("ws2811.") and any(k in key for k in ["width", "height", "serpentine"]):
             self._serpentine_map = self._build_serpentine_map()
+            self._xy_index_map = None
+        elif key == "matrix_type" or key.startswith("hub75."):
+            self._xy_index_map = None
+    
+    def set_matrix_type(self, matrix_type: str):
+        """Switch matrix type and apply its preset geometry and frame rate."""
+        matrix_type = matrix_type.lower()
+        preset = MATRIX_PRESETS.get(matrix_type)
+        if preset is None:
+            raise ValueError(f"Unknown matrix type: {matrix_type}")
+            
+        with self._lock:
+            self._config.update(matrix_type=matrix_type, target_fps=preset.fps)
+            if matrix_type == "hub75":
+                self._config["hub75"].update(cols=preset.width, rows=preset.height)
+            else:
+                self._config["ws2811"].update(
+                    width=preset.width,
+                    height=preset.height,
+                    num_pixels=preset.width * preset.height,
+                    serpentine=preset.serpentine,
+                )
+            self._dirty = True
+            
+        self._schedule_save()
+        
+        # Wiring changes with the matrix type
+        self._serpentine_map = self._build_serpentine_map()
+        self._xy_index_map = None
     
     def _schedule_save(self):
         """Schedule a debounced configuration save."""
@@ -288,6 +336,44 @@ class ConfigManager:
             width = self._config["hub75"]["cols"]
             return y * width + x
     
+    def xy_to_index_np(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Vectorized xy_to_index over coordinate arrays, returned as int32."""
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        
+        if self._config["matrix_type"] == "ws2811":
+            width = self._config["ws2811"]["width"]
+            height = self._config["ws2811"]["height"]
+            
+            if self._config["ws2811"]["serpentine"]:
+                # Reverse every other row
+                xs = np.where(ys & 1, width - 1 - xs, xs)
+            index = ys * width + xs
+            
+            # Match the serpentine map lookup: unknown coordinates map to 0
+            in_bounds = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+            return np.where(in_bounds, index, 0).astype(np.int32)
+        else:
+            # HUB75 uses direct mapping
+            width = self._config["hub75"]["cols"]
+            return (ys * width + xs).astype(np.int32)
+    
+    @property
+    def xy_index_map(self) -> np.ndarray:
+        """Pixel index for every (y, x) of the active matrix as an int32 array."""
+        index_map = self._xy_index_map
+        if index_map is None:
+            if self._config["matrix_type"] == "hub75":
+                width = self._config["hub75"]["cols"]
+                height = self._config["hub75"]["rows"]
+            else:
+                width = self._config["ws2811"]["width"]
+                height = self._config["ws2811"]["height"]
+            ys, xs = np.mgrid[0:height, 0:width]
+            index_map = self.xy_to_index_np(xs, ys)
+            self._xy_index_map = index_map
+        return index_map
+    
     def gamma_correct(self, value: int) -> int:
         """Apply gamma correction using lookup table (fast)."""
         if 0 <= value <= 255:
@@ -400,6 +486,7 @@ class ConfigManager:
                 # Rebuild lookup tables
                 self._gamma_table = self._build_gamma_table()
                 self._serpentine_map = self._build_serpentine_map()
+                self._xy_index_map = None
                 
                 logger.info(f"Loaded preset: {name}")
                 return True
@@ -10,6 +10,8 @@ from collections import deque
 from typing import Dict, Optional, Any
 import logging
 
+import numpy as np
+
 # Try to import psutil, but make it optional
 try:
     import psutil
@@ -35,43 +37,66 @@ logger = logging.getLogger(__name__)
 
 
 class RollingAverage:
-    """Efficient rolling average calculator."""
+    """Efficient rolling average calculator.
+    
+    Samples live in a preallocated NumPy ring buffer with a running sum, so
+    adding a sample and reading the average are O(1) with no allocation.
+    Integer dtypes round and saturate samples to the dtype's range.
+    """
     
-    def __init__(self, window_size: int = 30):
+    def __init__(self, window_size: int = 30, dtype=np.float64):
         self.window_size = window_size
-        self.values = deque(maxlen=window_size)
-        self._sum = 0.0
+        self._ring = np.zeros(window_size, dtype=dtype)
+        self._index = 0
+        self._count = 0
+        self._sum = 0
         self._lock = threading.Lock()
+        
+        # Integer rings store rounded, clamped samples
+        self._bounds = None
+        if np.issubdtype(self._ring.dtype, np.integer):
+            info = np.iinfo(self._ring.dtype)
+            self._bounds = (int(info.min), int(info.max))
     
     def add(self, value: float):
         """Add a value to the rolling average."""
+        if self._bounds is not None:
+            value = min(self._bounds[1], max(self._bounds[0], int(round(value))))
+        
         with self._lock:
-            if len(self.values) == self.window_size:
-                # Remove oldest value from sum
-                self._sum -= self.values[0]
+            # Slots start at zero, so the oldest value can always be subtracted
+            self._sum += value - self._ring[self._index].item()
+            self._ring[self._index] = value
             
-            self.values.append(value)
-            self._sum += value
+            self._index += 1
+            if self._index == self.window_size:
+                self._index = 0
+            if self._count < self.window_size:
+                self._count += 1
     
     @property
     def average(self) -> float:
         """Get the current average."""
         with self._lock:
-            if not self.values:
+            if not self._count:
                 return 0.0
-            return self._sum / len(self.values)
+            return self._sum / self._count
     
     @property
     def current(self) -> float:
         """Get the most recent value."""
         with self._lock:
-            return self.values[-1] if self.values else 0.0
+            if not self._count:
+                return 0.0
+            return float(self._ring[self._index - 1])
     
     def reset(self):
         """Reset the rolling average."""
         with self._lock:
-            self.values.clear()
-            self._sum = 0.0
+            self._ring.fill(0)
+            self._index = 0
+            self._count = 0
+            self._sum = 0
 
 
 class PerformanceMonitor:
@@ -80,7 +105,7 @@ class PerformanceMonitor:
     def __init__(self, stats_interval: float = 10.0):
         self.stats_interval = stats_interval
         self.metrics = {
-            'fps': RollingAverage(30),
+            'fps': RollingAverage(30, np.uint16),
             'frame_time_ms': RollingAverage(30),
             'cpu_percent': RollingAverage(10),
             'memory_mb': RollingAverage(10),
@@ -91,6 +116,7 @@ class PerformanceMonitor:
         # Frame timing
         self._last_frame_time = time.perf_counter()
         self._frame_start_time = None
+        self._prev_tick_ns = None
         
         # System metrics
         self._process = psutil.Process()
@@ -130,6 +156,27 @@ class PerformanceMonitor:
         self._last_frame_time = current_time
         self._frame_start_time = None
     
+    def tick(self):
+        """Mark one frame boundary; frame time is the delta since the previous tick.
+        
+        Single-call replacement for frame_start/frame_end. Timing stays in
+        integer nanoseconds and is only converted to float for the metrics.
+        """
+        now = time.perf_counter_ns()
+        prev = self._prev_tick_ns
+        self._prev_tick_ns = now
+        if prev is None:
+            return
+        
+        delta_ns = now - prev
+        self.metrics['frame_time_ms'].add(delta_ns / 1_000_000)
+        self.metrics['fps'].add(1_000_000_000 // delta_ns if delta_ns > 0 else 0)
+        self.metrics['total_frames'] += 1
+        
+        # Check for dropped frames (>33ms for 30 FPS target)
+        if delta_ns > 33_000_000:
+            self.metrics['dropped_frames'] += 1
+    
     def update(self, frame_time: float):
         """Update metrics with frame time (alternative to frame_start/end)."""
         self.metrics['frame_time_ms'].add(frame_time * 1000)
@@ -7,6 +7,9 @@ import logging
 import time
 import os
 from typing import Tuple, List, Union, Optional
+
+import numpy as np
+
 from .matrix_driver import MatrixDriver
 
 logger = logging.getLogger(__name__)
@@ -18,6 +21,12 @@ except ImportError:
     RGB_MATRIX_AVAILABLE = False
     logger.warning("rgbmatrix library not available - install with install_rgb_matrix.sh")
 
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
 try:
     import RPi.GPIO as GPIO
     GPIO_AVAILABLE = True
@@ -174,37 +183,64 @@ class HUB75Driver(MatrixDriver):
         except:
             return False
     
-    def update(self, frame_buffer: Union[List[Tuple[int, int, int]], bytearray]) -> None:
+    def update(self, frame_buffer: Union[List[Tuple[int, int, int]], bytearray, np.ndarray]) -> None:
         """Update using hardware double buffering with SwapOnVSync."""
         if not self.matrix or not self.canvas:
             return
             
         # Render to off-screen canvas for flicker-free updates
-        if isinstance(frame_buffer, bytearray):
-            # Bytearray format - fast path
-            idx = 0
-            for y in range(self.height):
-                for x in range(self.width):
-                    if idx + 2 < len(frame_buffer):
-                        r = frame_buffer[idx]
-                        g = frame_buffer[idx + 1]
-                        b = frame_buffer[idx + 2]
-                        self.canvas.SetPixel(x, y, r, g, b)
-                        idx += 3
-        else:
-            # List of tuples format
-            idx = 0
-            for y in range(self.height):
-                for x in range(self.width):
-                    if idx < len(frame_buffer):
-                        r, g, b = frame_buffer[idx]
-                        self.canvas.SetPixel(x, y, r, g, b)
-                        idx += 1
+        self.set_pixels_bulk(frame_buffer)
         
         # Hardware accelerated buffer swap - key to smooth animation!
         # This is the SwapOnVSync() that ensures tear-free updates
         self.canvas = self.matrix.SwapOnVSync(self.canvas)
     
+    def _to_image_array(self, frame_buffer) -> np.ndarray:
+        """Reshape a frame buffer into a (height, width, 3) uint8 array.
+        
+        Accepts an ndarray, a bytearray of packed RGB or a list of (R, G, B)
+        tuples in row-major order. Short buffers leave the remaining pixels black.
+        """
+        if isinstance(frame_buffer, np.ndarray):
+            flat = frame_buffer.astype(np.uint8, copy=False).reshape(-1)
+        elif isinstance(frame_buffer, (bytes, bytearray)):
+            flat = np.frombuffer(frame_buffer, dtype=np.uint8)
+        else:
+            flat = np.asarray(frame_buffer, dtype=np.uint8).reshape(-1)
+        
+        size = self.num_pixels * 3
+        if flat.size == size:
+            return flat.reshape(self.height, self.width, 3)
+        
+        # Only whole pixels are copied
+        frame = np.zeros(size, dtype=np.uint8)
+        count = min(size, flat.size - flat.size % 3)
+        frame[:count] = flat[:count]
+        return frame.reshape(self.height, self.width, 3)
+    
+    def set_pixels_bulk(self, pixels: Union[List[Tuple[int, int, int]], bytearray, np.ndarray]) -> None:
+        """Write a whole frame to the off-screen canvas.
+        
+        An (H, W, 3) uint8 array is pushed as-is, so smaller images are drawn
+        at the top-left corner; other buffers are laid out over the full matrix.
+        With Pillow available this is a single SetImage call instead of a
+        SetPixel call per pixel.
+        """
+        if not self.canvas:
+            return
+        
+        if isinstance(pixels, np.ndarray) and pixels.ndim == 3:
+            image = np.ascontiguousarray(pixels, dtype=np.uint8)
+        else:
+            image = self._to_image_array(pixels)
+        
+        if PIL_AVAILABLE:
+            self.canvas.SetImage(Image.fromarray(image))
+        else:
+            for y, row in enumerate(image.tolist()):
+                for x, (r, g, b) in enumerate(row):
+                    self.canvas.SetPixel(x, y, r, g, b)
+    
     def set_pixel(self, x: int, y: int, r: int, g: int, b: int) -> None:
         """Set a single pixel."""
         if self.canvas and 0 <= x < self.width and 0 <= y < self.height:
@@ -3,99 +3,68 @@ Matrix test animation - shows the serpentine wiring pattern
 Useful for verifying correct pixel mapping
 """
 
-import math
+import numpy as np
 
 def animate(pixels, config, frame):
     """Test pattern to verify serpentine wiring"""
     
+    width, height, count = config.MATRIX_WIDTH, config.MATRIX_HEIGHT, config.LED_COUNT
+    
+    # Work on the frame array directly when pixels has one
+    target = getattr(pixels, 'np', None)
+    leds = target if target is not None else np.array(pixels[:count], dtype=np.uint8).reshape(-1, 3)
+    
     # Different test modes based on frame count
     mode = (frame // 300) % 4  # Change mode every 5 seconds at 60fps
+    x, y = config.get_xy_grid()
+    colors = config.get_scratch('matrix_test.colors', x.shape + (3,), np.uint8)
+    colors.fill(0)
     
     if mode == 0:
         # Horizontal sweep - shows how rows are wired
-        sweep_pos = (frame % config.MATRIX_WIDTH)
+        sweep_pos = (frame % width)
         
-        for y in range(config.MATRIX_HEIGHT):
-            for x in range(config.MATRIX_WIDTH):
-                i = config.xy_to_index(x, y)
-                if i is None:
-                    continue
-                
-                if x == sweep_pos:
-                    # Bright white for current column
-                    pixels[i] = (255, 255, 255)
-                else:
-                    # Dim color showing row number
-                    row_color = int(20 + (y * 20))
-                    pixels[i] = (row_color, 0, 0)
+        # Dim color showing row number, bright white for current column
+        colors[..., 0] = np.minimum(255, 20 + (y * 20))
+        colors[x == sweep_pos] = 255
     
     elif mode == 1:
         # Vertical sweep
-        sweep_pos = (frame % config.MATRIX_HEIGHT)
+        sweep_pos = (frame % height)
         
-        for y in range(config.MATRIX_HEIGHT):
-            for x in range(config.MATRIX_WIDTH):
-                i = config.xy_to_index(x, y)
-                if i is None:
-                    continue
-                
-                if y == sweep_pos:
-                    # Bright white for current row
-                    pixels[i] = (255, 255, 255)
-                else:
-                    # Dim color showing column number
-                    col_color = int(20 + (x * 20))
-                    pixels[i] = (0, col_color, 0)
+        # Dim color showing column number, bright white for current row
+        colors[..., 1] = np.minimum(255, 20 + (x * 20))
+        colors[y == sweep_pos] = 255
     
     elif mode == 2:
         # Corner indicators - helps identify orientation
-        for y in range(config.MATRIX_HEIGHT):
-            for x in range(config.MATRIX_WIDTH):
-                i = config.xy_to_index(x, y)
-                if i is None:
-                    continue
-                
-                # Top-left: Red
-                if x == 0 and y == 0:
-                    pixels[i] = (255, 0, 0)
-                # Top-right: Green
-                elif x == config.MATRIX_WIDTH - 1 and y == 0:
-                    pixels[i] = (0, 255, 0)
-                # Bottom-left: Blue
-                elif x == 0 and y == config.MATRIX_HEIGHT - 1:
-                    pixels[i] = (0, 0, 255)
-                # Bottom-right: White
-                elif x == config.MATRIX_WIDTH - 1 and y == config.MATRIX_HEIGHT - 1:
-                    pixels[i] = (255, 255, 255)
-                else:
-                    # Gradient based on position
-                    r = int((x / config.MATRIX_WIDTH) * 50)
-                    g = int((y / config.MATRIX_HEIGHT) * 50)
-                    pixels[i] = (r, g, 30)
+        # Gradient based on position
+        colors[..., 0] = (x / width) * 50
+        colors[..., 1] = (y / height) * 50
+        colors[..., 2] = 30
+        
+        # Corners, lowest priority first so the top-left wins on tiny matrices
+        colors[height - 1, width - 1] = (255, 255, 255)  # Bottom-right: White
+        colors[height - 1, 0] = (0, 0, 255)              # Bottom-left: Blue
+        colors[0, width - 1] = (0, 255, 0)               # Top-right: Green
+        colors[0, 0] = (255, 0, 0)                       # Top-left: Red
     
+    if mode < 3:
+        valid = config.valid_mask
+        leds[config.idx_map_flat[valid]] = colors.reshape(-1, 3)[valid]
     else:
         # Sequential fill - shows physical LED order
-        fill_count = frame % config.LED_COUNT
+        fill_count = frame % count
         
-        for i in range(config.LED_COUNT):
-            if i <= fill_count:
-                # Rainbow color based on position
-                hue = (i / config.LED_COUNT) * 360
-                color = config.interpolate_palette(hue / 360)
-                pixels[i] = color
-            else:
-                pixels[i] = (0, 0, 0)
+        # Rainbow color based on position
+        i = np.arange(count)
+        hue = (i / count) * 360
+        rainbow = config.palette_lut[(hue / 360 * 1023).astype(np.intp)]
+        rainbow[i > fill_count] = 0
+        leds[:count] = rainbow
     
-    # Apply brightness and gamma
-    for i in range(config.LED_COUNT):
-        r, g, b = pixels[i]
-        r = int(r * config.BRIGHTNESS)
-        g = int(g * config.BRIGHTNESS)
-        b = int(b * config.BRIGHTNESS)
-        
-        # Gamma correction
-        r = int(255 * pow(r / 255, config.GAMMA))
-        g = int(255 * pow(g / 255, config.GAMMA))
-        b = int(255 * pow(b / 255, config.GAMMA))
-        
-        pixels[i] = (r, g, b)
\ No newline at end of file
+    # Apply brightness and gamma in one gather
+    config.apply_lut(leds[:count], config.get_gamma_lut(config.BRIGHTNESS))
+    
+    if target is None:
+        pixels[0:count] = list(map(tuple, leds.tolist()))
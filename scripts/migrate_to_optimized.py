@@ -7,16 +7,39 @@ This script helps migrate settings and configurations from the old structure.
 import json
 import os
 import shutil
+import sys
 from pathlib import Path
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _walk_settings(directory):
+    """Yield (path, mtime) for every settings.json below directory."""
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return
+    
+    for entry in entries:
+        # DirEntry type checks come from the directory listing, no stat needed
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk_settings(entry.path)
+        elif entry.name == "settings.json" and entry.is_file(follow_symlinks=False):
+            yield Path(entry.path), entry.stat(follow_symlinks=False).st_mtime
+
 
 def find_settings_files():
-    """Find all settings.json files in the project."""
-    settings_files = []
+    """Find all settings.json files in the project as (path, mtime) pairs."""
+    settings_files = {}
     
     # Common locations for settings files
     search_paths = [
@@ -28,38 +51,34 @@ def find_settings_files():
     
     for base_path in search_paths:
         if base_path.exists():
-            for settings_file in base_path.rglob("settings.json"):
-                settings_files.append(settings_file)
+            # Search paths overlap, so key on path to list each file once
+            settings_files.update(_walk_settings(base_path))
     
-    return settings_files
+    return list(settings_files.items())
+
+
+def load_settings_file(settings_file):
+    """Parse one settings file, using orjson when it is installed."""
+    data = Path(settings_file).read_bytes()
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def merge_settings(settings_files):
-    """Merge settings from multiple files, preferring newer/more complete ones."""
-    merged = {}
-    
-    for settings_file in settings_files:
+    """Pick the settings from the newest readable (path, mtime) pair."""
+    # Newest wins, so only parse files until one loads cleanly
+    for settings_file, mtime in sorted(settings_files, key=lambda item: item[1], reverse=True):
         try:
-            with open(settings_file, 'r') as f:
-                data = json.load(f)
-                
-            # Get file modification time
-            mtime = os.path.getmtime(settings_file)
-            
-            logger.info(f"Found settings in {settings_file} (modified: {mtime})")
-            
-            # Merge with priority to newer files
-            if not merged or mtime > merged.get('_mtime', 0):
-                merged.update(data)
-                merged['_mtime'] = mtime
-                
+            data = load_settings_file(settings_file)
         except Exception as e:
             logger.error(f"Error reading {settings_file}: {e}")
+            continue
+        
+        logger.info(f"Using settings from {settings_file} (modified: {mtime})")
+        return data
     
-    # Remove internal metadata
-    merged.pop('_mtime', None)
-    
-    return merged
+    return {}
 
 
 def migrate_animations():
@@ -2,33 +2,44 @@
 Shimmer animation - creates a sparkling effect across the LED matrix
 """
 
-import random
-import math
+import numpy as np
+
+# Per-LED wave phase offsets, keyed on LED count
+_phase_offsets = {}
 
 def animate(pixels, config, frame):
     """Create shimmering sparkle effect"""
     
+    count = config.LED_COUNT
+    phase = _phase_offsets.get(count)
+    if phase is None:
+        phase = np.arange(count) * 0.1
+        _phase_offsets.clear()
+        _phase_offsets[count] = phase
+    
     # Base color from palette
-    base_color = config.interpolate_palette(0.5)
-    
-    for i in range(config.LED_COUNT):
-        # Create random shimmer pattern
-        shimmer = random.random()
-        
-        # Add wave component for flowing effect
-        wave = (math.sin(frame * 0.05 * config.SPEED + i * 0.1) + 1) / 2
-        
-        # Combine shimmer and wave
-        brightness = (shimmer * 0.7 + wave * 0.3) * config.INTENSITY
-        
-        # Apply to base color
-        r = int(base_color[0] * brightness * config.BRIGHTNESS)
-        g = int(base_color[1] * brightness * config.BRIGHTNESS)
-        b = int(base_color[2] * brightness * config.BRIGHTNESS)
-        
-        # Gamma correction
-        r = int(255 * pow(r / 255, config.GAMMA))
-        g = int(255 * pow(g / 255, config.GAMMA))
-        b = int(255 * pow(b / 255, config.GAMMA))
-        
-        pixels[i] = (r, g, b)
\ No newline at end of file
+    base_color = config.palette_lut[511].astype(np.float64)
+    
+    # Create random shimmer pattern
+    shimmer = config.rng.random(count, dtype=np.float32)
+    
+    # Add wave component for flowing effect
+    wave = (np.sin(frame * 0.05 * config.SPEED + phase) + 1) / 2
+    
+    # Combine shimmer and wave
+    brightness = (shimmer * 0.7 + wave * 0.3) * config.INTENSITY
+    
+    # Apply to base color
+    rgb = base_color * brightness[:, np.newaxis] * config.BRIGHTNESS
+    
+    # Clamp the whole buffer in place
+    np.clip(rgb, 0, 255, out=rgb)
+    
+    # Gamma correction through the shared lookup table
+    rgb = config.apply_lut(rgb.astype(np.uint8), config.get_gamma_lut())
+    
+    target = getattr(pixels, 'np', None)
+    if target is not None:
+        target[:count] = rgb
+    else:
+        pixels[0:count] = list(map(tuple, rgb.tolist()))
\ No newline at end of file
@@ -0,0 +1,18 @@
+"""
+Shared pytest fixtures for the LightBox test suite.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture(scope="session")
+def config():
+    """One ConfigManager for tests that only read it (gamma/serpentine tables built once)."""
+    from core.config import ConfigManager
+    return ConfigManager()
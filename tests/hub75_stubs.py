@@ -0,0 +1,50 @@
+"""
+Hardware stand-ins and test data shared by the HUB75 test modules.
+
+Kept free of the enhanced LightBox imports so the helpers themselves are
+exercised even where those modules are unavailable.
+"""
+
+import contextlib
+import sys
+import types
+from unittest.mock import patch
+
+import numpy as np
+
+
+def make_gpio_stub():
+    """RPi.GPIO stand-in where every input reads high, i.e. the PWM jumper is installed"""
+    gpio = types.ModuleType('RPi.GPIO')
+    gpio.BCM = 11
+    gpio.BOARD = 10
+    gpio.IN = 1
+    gpio.OUT = 0
+    gpio.HIGH = 1
+    gpio.LOW = 0
+    gpio.PUD_UP = 22
+    gpio.PUD_DOWN = 21
+    gpio.setwarnings = lambda *args: None
+    gpio.setmode = lambda *args: None
+    gpio.setup = lambda *args, **kwargs: None
+    gpio.input = lambda pin: gpio.HIGH
+    gpio.output = lambda *args: None
+    gpio.cleanup = lambda *args: None
+    return gpio
+
+
+@contextlib.contextmanager
+def gpio_stub_installed():
+    """Install the RPi.GPIO stub in sys.modules, restoring the previous entries on exit"""
+    gpio = make_gpio_stub()
+    rpi = types.ModuleType('RPi')
+    rpi.GPIO = gpio
+    with patch.dict(sys.modules, {'RPi': rpi, 'RPi.GPIO': gpio}):
+        yield gpio
+
+
+def hub75_test_pattern(width=64, height=64):
+    """Test pattern (x*4, y*4, 128) in row-major pixel order, as a uint8 array and a tuple list"""
+    ys, xs = np.divmod(np.arange(width * height), width)
+    array = np.stack([xs * 4, ys * 4, np.full(width * height, 128)], axis=1).astype(np.uint8)
+    return array, list(map(tuple, array.tolist()))
@@ -8,162 +8,203 @@ import unittest
 import sys
 import os
 import json
+import copy
 import tempfile
-from unittest.mock import Mock, patch, MagicMock
+from operator import attrgetter
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from tests.hub75_stubs import gpio_stub_installed, hub75_test_pattern
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'LB_Interface', 'LightBox'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'LB_Interface', 'LightBox', 'webgui'))
 
-from config_enhanced import Config, HUB75Settings
-from matrix_driver_enhanced import create_matrix_driver, HUB75Driver
-from app_enhanced import create_app
+# Skip the module at collection when the enhanced LightBox modules are absent
+config_enhanced = pytest.importorskip('config_enhanced')
+matrix_driver_enhanced = pytest.importorskip('matrix_driver_enhanced')
+app_enhanced = pytest.importorskip('app_enhanced')
+
+Config, HUB75Settings = config_enhanced.Config, config_enhanced.HUB75Settings
+create_matrix_driver, HUB75Driver = matrix_driver_enhanced.create_matrix_driver, matrix_driver_enhanced.HUB75Driver
+create_app = app_enhanced.create_app
+
+
+@pytest.fixture(scope='module', autouse=True)
+def gpio_stub():
+    """Install the RPi.GPIO stub for this module's tests and restore sys.modules afterward"""
+    with gpio_stub_installed() as gpio:
+        yield gpio
+
+
+# Stats reported by StubDriver
+_STUB_STATS = {
+    'fps': 29.8,
+    'avg_fps': 30.1,
+    'frame_count': 1234,
+    'uptime': 120.5
+}
+
+
+# Default HUB75 settings and their serialized form, copied rather than rebuilt
+_DEFAULT_SETTINGS = HUB75Settings()
+_DEFAULT_DICT = _DEFAULT_SETTINGS.to_dict()
+
+
+class StubDriver:
+    """Minimal driver exposing only what the web endpoints read"""
+    
+    def get_performance_stats(self):
+        return dict(_STUB_STATS)
+
+
+class StubMatrix:
+    """Minimal matrix with a stopped render loop and a stub driver"""
+    
+    def __init__(self):
+        self.running = False
+        self.driver = StubDriver()
+
+
+class CountingCanvas:
+    """Canvas stub that only counts SetPixel calls"""
+    
+    def __init__(self):
+        self.set_pixel_count = 0
+    
+    def SetPixel(self, x, y, r, g, b):
+        self.set_pixel_count += 1
+
+
+def _hub75_driver():
+    """Fresh HUB75 driver built with hardware init patched out, so tests share no state"""
+    with patch('matrix_driver_enhanced.HUB75Driver.init_hardware', return_value=True):
+        config = Config()
+        config.set_matrix_type("HUB75")
+        return HUB75Driver(config)
+
+
+@pytest.fixture(scope='module')
+def web_app():
+    """Config and Flask app with a stub matrix, built once for the module"""
+    config = Config()
+    config.matrix_type = "HUB75"
+    return config, create_app(matrix=StubMatrix(), config=config)
+
 
+@pytest.fixture
+def web_config(web_app):
+    """The app's config, reset to the state the endpoint tests change"""
+    config = web_app[0]
+    config.matrix_type = "HUB75"
+    config.hub75_settings = copy.copy(_DEFAULT_SETTINGS)
+    return config
 
-class TestHUB75WebIntegration(unittest.TestCase):
+
+@pytest.fixture
+def client(web_app, web_config):
+    """Fresh test client for the shared app"""
+    return web_app[1].test_client()
+
+
+class TestHUB75WebIntegration:
     """Test HUB75 integration with web interface"""
     
-    def setUp(self):
-        """Set up test fixtures"""
-        self.config = Config()
-        self.config.matrix_type = "HUB75"
-        
-        # Mock matrix for testing
-        self.mock_matrix = MagicMock()
-        self.mock_matrix.running = False
-        self.mock_matrix.driver = MagicMock()
-        
-        # Create Flask test app
-        self.app = create_app(matrix=self.mock_matrix, config=self.config)
-        self.client = self.app.test_client()
-        
-    def test_matrix_type_endpoint(self):
-        """Test matrix type GET and POST endpoints"""
+    @pytest.mark.parametrize('path,expected,post_body,post_response,applied', [
+        (
+            '/api/matrix-type',
+            {'type': 'HUB75'},
+            {'type': 'WS2811'},
+            {'success': True},
+            {'matrix_type': 'WS2811'},
+        ),
+        (
+            '/api/hub75-config',
+            {'pwm_bits': 11, 'gpio_slowdown': 4},
+            {'pwm_bits': 9, 'gpio_slowdown': 2, 'hardware_mapping': 'regular'},
+            {},
+            {
+                'hub75_settings.pwm_bits': 9,
+                'hub75_settings.gpio_slowdown': 2,
+                'hub75_settings.hardware_mapping': 'regular',
+            },
+        ),
+    ], ids=['matrix-type', 'hub75-config'])
+    def test_settings_endpoint(self, client, web_config, path, expected, post_body,
+                               post_response, applied):
+        """Test a settings endpoint reports the current value and applies a POST"""
         # Test GET
-        response = self.client.get('/api/matrix-type')
-        self.assertEqual(response.status_code, 200)
-        data = json.loads(response.data)
-        self.assertEqual(data['type'], 'HUB75')
-        
-        # Test POST - switch to WS2811
-        response = self.client.post('/api/matrix-type',
-                                  json={'type': 'WS2811'},
-                                  content_type='application/json')
-        self.assertEqual(response.status_code, 200)
-        data = json.loads(response.data)
-        self.assertTrue(data['success'])
-        self.assertEqual(self.config.matrix_type, 'WS2811')
-        
-        # Test POST - switch back to HUB75
-        response = self.client.post('/api/matrix-type',
-                                  json={'type': 'HUB75'},
-                                  content_type='application/json')
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(self.config.matrix_type, 'HUB75')
-        
-        # Test invalid matrix type
-        response = self.client.post('/api/matrix-type',
-                                  json={'type': 'INVALID'},
-                                  content_type='application/json')
-        self.assertEqual(response.status_code, 400)
-        
-    def test_hub75_config_endpoint(self):
-        """Test HUB75 configuration GET and POST endpoints"""
-        # Test GET
-        response = self.client.get('/api/hub75-config')
-        self.assertEqual(response.status_code, 200)
-        data = json.loads(response.data)
-        self.assertEqual(data['pwm_bits'], 11)
-        self.assertEqual(data['gpio_slowdown'], 4)
+        response = client.get(path)
+        assert response.status_code == 200
+        data = response.get_json()
+        for key, value in expected.items():
+            assert data[key] == value
         
         # Test POST - update configuration
-        new_config = {
-            'pwm_bits': 9,
-            'gpio_slowdown': 2,
-            'hardware_mapping': 'regular'
-        }
-        response = self.client.post('/api/hub75-config',
-                                  json=new_config,
-                                  content_type='application/json')
-        self.assertEqual(response.status_code, 200)
+        response = client.post(path, json=post_body, content_type='application/json')
+        assert response.status_code == 200
+        data = response.get_json()
+        for key, value in post_response.items():
+            assert data[key] == value
+        
+        # Verify changes, one config attribute at a time
+        for attr, value in applied.items():
+            assert attrgetter(attr)(web_config) == value, attr
+        
+    def test_matrix_type_rejects_invalid(self, client, web_config):
+        """Test an unknown matrix type is refused"""
+        response = client.post('/api/matrix-type',
+                               json={'type': 'INVALID'},
+                               content_type='application/json')
+        assert response.status_code == 400
+        assert web_config.matrix_type == 'HUB75'
+        
+    def test_performance_stats_endpoint(self, client):
+        """Test performance statistics endpoint"""
+        response = client.get('/api/performance-stats')
+        assert response.status_code == 200
+        data = response.get_json()
         
-        # Verify changes
-        self.assertEqual(self.config.hub75_settings.pwm_bits, 9)
-        self.assertEqual(self.config.hub75_settings.gpio_slowdown, 2)
-        self.assertEqual(self.config.hub75_settings.hardware_mapping, 'regular')
+        # Stub values survive the JSON round trip exactly
+        assert {key: data[key] for key in _STUB_STATS} == _STUB_STATS
         
-    def test_performance_stats_endpoint(self):
-        """Test performance statistics endpoint"""
-        # Mock performance stats
-        self.mock_matrix.driver.get_performance_stats.return_value = {
-            'fps': 29.8,
-            'avg_fps': 30.1,
-            'frame_count': 1234,
-            'uptime': 120.5
-        }
+    def test_config_persistence(self, web_config, tmp_path):
+        """Test configuration persistence across restarts"""
+        temp_file = str(tmp_path / 'config.json')
         
-        response = self.client.get('/api/performance-stats')
-        self.assertEqual(response.status_code, 200)
-        data = json.loads(response.data)
+        # Save current config
+        web_config.save_settings(temp_file)
         
-        self.assertAlmostEqual(data['fps'], 29.8, places=1)
-        self.assertAlmostEqual(data['avg_fps'], 30.1, places=1)
-        self.assertEqual(data['frame_count'], 1234)
+        # Create new config and load
+        config2 = Config()
+        config2.load_settings(temp_file)
         
-    def test_config_persistence(self):
-        """Test configuration persistence across restarts"""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            temp_file = f.name
-            
-        try:
-            # Save current config
-            self.config.save_settings(temp_file)
-            
-            # Create new config and load
-            config2 = Config()
-            config2.load_settings(temp_file)
-            
-            # Verify HUB75 settings persisted
-            self.assertEqual(config2.matrix_type, 'HUB75')
-            self.assertEqual(config2.hub75_settings.pwm_bits, 
-                           self.config.hub75_settings.pwm_bits)
-            
-        finally:
-            os.unlink(temp_file)
+        # Verify HUB75 settings persisted
+        assert config2.matrix_type == 'HUB75'
+        assert config2.hub75_settings.pwm_bits == web_config.hub75_settings.pwm_bits
 
 
 class TestHUB75AnimationIntegration(unittest.TestCase):
     """Test HUB75 with animation system"""
     
-    @patch('matrix_driver_enhanced.HUB75Driver.init_hardware')
-    def test_animation_compatibility(self, mock_init):
+    # 64x64 test pattern (x*4, y*4, 128) in row-major pixel order
+    PATTERN_ARRAY, PATTERN = hub75_test_pattern()
+    
+    def test_animation_compatibility(self):
         """Test that animations work with HUB75 driver"""
-        mock_init.return_value = True
-        
-        # Create config and driver
-        config = Config()
-        config.set_matrix_type("HUB75")
-        driver = HUB75Driver(config)
+        driver = _hub75_driver()
         
-        # Mock the matrix and canvas
-        driver.matrix = MagicMock()
-        driver.offscreen_canvas = MagicMock()
+        # Stub the matrix and canvas
+        driver.matrix = SimpleNamespace(SwapOnVSync=Mock(side_effect=lambda canvas: canvas))
+        driver.offscreen_canvas = canvas = CountingCanvas()
         
-        # Simulate animation frame
-        total_pixels = 64 * 64
-        pixels = [(0, 0, 0)] * total_pixels
-        
-        # Create test pattern
-        for i in range(total_pixels):
-            x = i % 64
-            y = i // 64
-            pixels[i] = (x * 4, y * 4, 128)
-        
-        # Test bulk pixel update
-        driver.set_pixels_bulk(pixels)
+        # Test bulk pixel update with an animation-sized frame
+        driver.set_pixels_bulk(self.PATTERN)
         
         # Verify pixels were set
-        self.assertEqual(driver.offscreen_canvas.SetPixel.call_count, total_pixels)
+        self.assertEqual(canvas.set_pixel_count, 64 * 64)
         
         # Test show/update
         driver.show()
@@ -193,19 +234,10 @@ class TestHUB75AnimationIntegration(unittest.TestCase):
 class TestHUB75PerformanceOptimizations(unittest.TestCase):
     """Test performance optimization features"""
     
-    @patch('RPi.GPIO')
-    @patch('matrix_driver_enhanced.HUB75Driver._create_optimized_options')
-    def test_hardware_pwm_detection(self, mock_create_options, mock_gpio):
+    def test_hardware_pwm_detection(self):
         """Test hardware PWM jumper detection"""
-        # Mock GPIO for hardware PWM detection
-        mock_gpio.setmode.return_value = None
-        mock_gpio.setup.return_value = None
-        mock_gpio.input.side_effect = [1, 1]  # Both pins read same = jumper installed
-        mock_gpio.cleanup.return_value = None
-        
-        config = Config()
-        config.matrix_type = "HUB75"
-        driver = HUB75Driver(config)
+        # The gpio_stub fixture makes both pins read the same level
+        driver = _hub75_driver()
         
         # Test detection
         result = driver._detect_hardware_pwm()
@@ -216,15 +248,18 @@ class TestHUB75PerformanceOptimizations(unittest.TestCase):
         """Test performance monitoring functionality"""
         from matrix_driver_enhanced import PerformanceMonitor
         
-        monitor = PerformanceMonitor()
-        
-        # Simulate frames
-        import time
-        for i in range(10):
-            monitor.update()
-            time.sleep(0.033)  # ~30 FPS
+        # Virtual clock - frames advance it instead of sleeping
+        clock = SimpleNamespace(now=1000.0)
+        with patch('matrix_driver_enhanced.time.time', side_effect=lambda: clock.now), \
+             patch('matrix_driver_enhanced.time.monotonic', side_effect=lambda: clock.now):
+            monitor = PerformanceMonitor()
             
-        stats = monitor.get_stats()
+            # Simulate frames
+            for i in range(10):
+                monitor.update()
+                clock.now += 0.033  # ~30 FPS
+                
+            stats = monitor.get_stats()
         
         # Check stats
         self.assertEqual(stats['frame_count'], 10)
@@ -236,7 +271,7 @@ class TestHUB75PerformanceOptimizations(unittest.TestCase):
         
     def test_configuration_limits(self):
         """Test configuration parameter validation"""
-        settings = HUB75Settings()
+        settings = copy.copy(_DEFAULT_SETTINGS)
         
         # Test valid ranges
         settings.pwm_bits = 11
@@ -246,11 +281,10 @@ class TestHUB75PerformanceOptimizations(unittest.TestCase):
         self.assertEqual(settings.gpio_slowdown, 5)
         
         # Test serialization with all options
-        data = settings.to_dict()
-        self.assertIn('pwm_bits', data)
-        self.assertIn('gpio_slowdown', data)
-        self.assertIn('hardware_mapping', data)
-        self.assertIn('disable_hardware_pulsing', data)
+        self.assertGreaterEqual(
+            _DEFAULT_DICT.keys(),
+            {'pwm_bits', 'gpio_slowdown', 'hardware_mapping', 'disable_hardware_pulsing'}
+        )
 
 
 class TestMigrationScript(unittest.TestCase):
@@ -258,39 +292,35 @@ class TestMigrationScript(unittest.TestCase):
     
     def test_config_migration(self):
         """Test configuration migration for HUB75 support"""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            # Write old-style config
-            old_config = {
-                "matrix_width": 10,
-                "matrix_height": 10,
-                "brightness": 0.5,
-                "current_program": "rainbow"
-            }
-            json.dump(old_config, f)
-            temp_file = f.name
-            
-        try:
-            # Import migration function
-            from migrate_to_hub75 import migrate_config
-            from pathlib import Path
-            
-            # Run migration
-            result = migrate_config(Path(temp_file))
-            self.assertTrue(result)
-            
-            # Load migrated config
-            with open(temp_file, 'r') as f:
-                migrated = json.load(f)
-                
-            # Verify migration
-            self.assertIn('hub75_settings', migrated)
-            self.assertIn('matrix_type', migrated)
-            self.assertEqual(migrated['matrix_type'], 'WS2811')  # Default to existing
-            self.assertEqual(migrated['hub75_settings']['rows'], 64)
-            self.assertEqual(migrated['hub75_settings']['cols'], 64)
-            
-        finally:
-            os.unlink(temp_file)
+        from migrate_to_hub75 import migrate_config
+        from pathlib import Path
+        
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        temp_file = Path(temp_dir.name) / 'config.json'
+        
+        # Write old-style config
+        old_config = {
+            "matrix_width": 10,
+            "matrix_height": 10,
+            "brightness": 0.5,
+            "current_program": "rainbow"
+        }
+        temp_file.write_text(json.dumps(old_config))
+        
+        # Run migration
+        result = migrate_config(temp_file)
+        self.assertTrue(result)
+        
+        # Load migrated config
+        migrated = json.loads(temp_file.read_text())
+        
+        # Verify migration
+        self.assertIn('hub75_settings', migrated)
+        self.assertIn('matrix_type', migrated)
+        self.assertEqual(migrated['matrix_type'], 'WS2811')  # Default to existing
+        self.assertEqual(migrated['hub75_settings']['rows'], 64)
+        self.assertEqual(migrated['hub75_settings']['cols'], 64)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for the HUB75 test helpers, which run without the enhanced modules.
+"""
+
+import sys
+
+import pytest
+
+from tests.hub75_stubs import gpio_stub_installed, hub75_test_pattern
+
+
+class TestGPIOStub:
+    """Test the RPi.GPIO stand-in."""
+    
+    def test_stub_installed_and_removed(self):
+        """Test the stub is importable inside the block and sys.modules is restored after."""
+        before = {name: sys.modules.get(name) for name in ('RPi', 'RPi.GPIO')}
+        
+        with gpio_stub_installed() as gpio:
+            import RPi.GPIO as GPIO
+            assert GPIO is gpio
+            GPIO.setmode(GPIO.BCM)
+            GPIO.setup(18, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            assert GPIO.input(18) == GPIO.input(4) == GPIO.HIGH
+            GPIO.cleanup()
+        
+        assert {name: sys.modules.get(name) for name in ('RPi', 'RPi.GPIO')} == before
+
+
+class TestHUB75Pattern:
+    """Test the shared HUB75 test pattern."""
+    
+    @pytest.mark.parametrize('width,height', [(64, 64), (64, 32)])
+    def test_pattern_matches_per_pixel_loop(self, width, height):
+        """Test the divmod pattern equals the per-pixel (x*4, y*4, 128) loop."""
+        total_pixels = width * height
+        expected = [(0, 0, 0)] * total_pixels
+        for i in range(total_pixels):
+            x = i % width
+            y = i // width
+            expected[i] = (x * 4, y * 4, 128)
+        
+        array, pattern = hub75_test_pattern(width, height)
+        assert array.shape == (total_pixels, 3)
+        assert pattern == expected
@@ -2,5 +2,6 @@
 
 from . import color_utils
 from . import frame_utils
+from . import fx_kernel
 
-__all__ = ['color_utils', 'frame_utils']
\ No newline at end of file
+__all__ = ['color_utils', 'frame_utils', 'fx_kernel']
\ No newline at end of file
@@ -7,6 +7,18 @@ import colorsys
 from typing import Tuple, List, Dict
 from functools import lru_cache
 
+import numpy as np
+
+# Which of (C+m, X+m, m) lands in R, G, B for each 60-degree hue sector
+_HSV_SECTORS = np.array([
+    (0, 1, 2),
+    (1, 0, 2),
+    (2, 0, 1),
+    (2, 1, 0),
+    (1, 2, 0),
+    (0, 2, 1)
+], dtype=np.intp)
+
 
 @lru_cache(maxsize=256)
 def hsv_to_rgb(h: float, s: float, v: float) -> Tuple[int, int, int]:
@@ -29,6 +41,31 @@ def hsv_to_rgb(h: float, s: float, v: float) -> Tuple[int, int, int]:
     )
 
 
+def hsv_to_rgb_array(h: np.ndarray, s, v) -> np.ndarray:
+    """
+    Vectorized HSV to RGB conversion for whole frames.
+    
+    Args:
+        h: Hue array (0.0-1.0, wraps)
+        s: Saturation (scalar or array, 0.0-1.0)
+        v: Value/brightness (scalar or array, 0.0-1.0)
+        
+    Returns:
+        uint8 array of shape h.shape + (3,) with values 0-255
+    """
+    h6 = (np.asarray(h) % 1.0) * 6
+    sector = h6.astype(np.intp) % 6
+    s = np.clip(s, 0.0, 1.0)
+    v = np.clip(v, 0.0, 1.0)
+    c = v * s
+    x = c * (1 - np.abs(h6 % 2 - 1))
+    m = v - c
+    
+    vals = np.stack(np.broadcast_arrays(c + m, x + m, m), axis=-1)
+    rgb = np.take_along_axis(vals, _HSV_SECTORS[sector], axis=-1)
+    return (rgb * 255).astype(np.uint8)
+
+
 def rgb_to_hsv(r: int, g: int, b: int) -> Tuple[float, float, float]:
     """
     Convert RGB color to HSV.
@@ -0,0 +1,207 @@
+"""
+Shared wave-to-palette kernel for the waves, symmetry and parametric_waves animations
+Each kind builds a palette index grid; one common tail does the LUT gather and write
+"""
+
+import math
+
+import numpy as np
+
+# Wave field kinds
+WAVES = 0
+SYMMETRY = 1
+PARAMETRIC = 2
+
+# Q15 sine table for WAVES; phases are measured in 1/SIN_LUT_SIZE turns
+SIN_LUT_SIZE = 4096
+SIN_LUT = (np.sin(np.linspace(0, 2 * np.pi, SIN_LUT_SIZE, endpoint=False)) * 32767).astype(np.int16)
+PHASE_SCALE = SIN_LUT_SIZE / (2 * np.pi)
+SIN_MAX = 32767
+
+# Specialized PARAMETRIC kernels, keyed on (wave_count, wave_amplitude, phase_shift, interference)
+_kernel_cache = {}
+_KERNEL_CACHE_SIZE = 16
+
+# One parametric wave component, with its frequency and phase baked in
+_WAVE_TEMPLATE = """
+    # Wave {w}
+    f_xy = {wave_freq!r} * scale
+    np.multiply(x, f_xy, out=h_wave)
+    h_wave += t_h + {phase!r}
+    np.sin(h_wave, out=h_wave)
+    np.multiply(y, f_xy, out=v_wave)
+    v_wave += t_v + {phase!r}
+    np.sin(v_wave, out=v_wave)
+    np.add(h_wave, v_wave, out=h_wave)
+{diagonal}    h_wave *= {component_scale!r}
+    {accumulate}
+"""
+
+# Diagonal wave, omitted entirely when interference is zero
+_DIAGONAL_TEMPLATE = """    np.multiply(diag, {diag_freq!r} * scale, out=d_wave)
+    d_wave += t_d + {phase!r}
+    np.sin(d_wave, out=d_wave)
+    d_wave *= {interference!r}
+    h_wave += d_wave
+"""
+
+def _build_kernel(wave_count, wave_amplitude, phase_shift, interference):
+    """Generate the parametric wave-sum loop unrolled with every parameter inlined"""
+    component_scale = wave_amplitude / (2 + interference)
+    
+    body = []
+    for w in range(int(wave_count)):
+        wave_freq = 0.2 + (w * 0.1)
+        phase = w * phase_shift * math.pi
+        diagonal = ''
+        if interference:
+            diagonal = _DIAGONAL_TEMPLATE.format(
+                diag_freq=wave_freq * 0.7, phase=phase, interference=interference)
+        body.append(_WAVE_TEMPLATE.format(
+            w=w,
+            wave_freq=wave_freq,
+            phase=phase,
+            diagonal=diagonal,
+            component_scale=component_scale,
+            accumulate='np.copyto(wave_sum, h_wave)' if w == 0 else 'wave_sum += h_wave',
+        ))
+    if not body:
+        body.append("    wave_sum.fill(0)\n")
+    
+    source = (
+        "def kernel(x, y, diag, wave_sum, h_wave, v_wave, d_wave, t_h, t_v, t_d, scale):\n"
+        + "".join(body)
+        + f"    wave_sum /= {wave_count!r}\n"
+    )
+    namespace = {"np": np}
+    exec(compile(source, f"<parametric_waves x{int(wave_count)}>", "exec"), namespace)
+    return namespace["kernel"]
+
+def _get_kernel(wave_count, wave_amplitude, phase_shift, interference):
+    """Get the parametric kernel for a parameter set, compiling it on first use"""
+    key = (wave_count, wave_amplitude, phase_shift, interference)
+    kernel = _kernel_cache.get(key)
+    if kernel is None:
+        kernel = _build_kernel(*key)
+        # Slider drags produce many parameter sets - keep the cache bounded
+        if len(_kernel_cache) >= _KERNEL_CACHE_SIZE:
+            _kernel_cache.clear()
+        _kernel_cache[key] = kernel
+    return kernel
+
+def _add_sine(config, coord, freq, offset, acc):
+    """Add SIN_LUT[coord*freq + offset] (radians) to the int32 accumulator"""
+    phase = config.get_scratch('fx.phase', coord.shape)
+    phase_idx = config.get_scratch('fx.phase_idx', coord.shape, np.int32)
+    sine = config.get_scratch('fx.sine', coord.shape, np.int16)
+    
+    np.multiply(coord, freq * PHASE_SCALE, out=phase)
+    # Wrap the per-frame offset first so the int32 cast below stays in range
+    phase += (offset * PHASE_SCALE) % SIN_LUT_SIZE
+    np.copyto(phase_idx, phase, casting='unsafe')
+    phase_idx &= SIN_LUT_SIZE - 1
+    np.take(SIN_LUT, phase_idx, out=sine)
+    acc += sine
+
+def _diagonal(config):
+    """x + y over the matrix grid, in a reused buffer"""
+    x, y = config.get_xy_grid()
+    diag = config.get_scratch('fx.diag', x.shape)
+    np.add(x, y, out=diag)
+    return diag
+
+def _palette_index(config, pos):
+    """Convert a palette position grid already scaled to 0..1023 into integer indices"""
+    palette_idx = config.get_scratch('fx.palette_idx', pos.shape, np.intp)
+    np.copyto(palette_idx, pos, casting='unsafe')
+    return palette_idx
+
+def _waves_index(config, frame, params):
+    """Three summed plane waves, evaluated in Q15 fixed point"""
+    x, y = config.get_xy_grid()
+    acc = config.get_scratch('fx.acc', x.shape, np.int32)
+    
+    # Per-frame constants
+    speed, scale = config.SPEED, config.SCALE
+    t_h = frame * 0.03 * speed
+    t_v = frame * 0.04 * speed
+    t_d = frame * 0.02 * speed
+    f_xy = 0.3 * scale
+    f_d = 0.2 * scale
+    
+    # Create and combine the wave components in fixed point
+    acc.fill(0)
+    _add_sine(config, x, f_xy, t_h, acc)
+    _add_sine(config, y, f_xy, t_v, acc)
+    _add_sine(config, _diagonal(config), f_d, t_d, acc)
+    
+    # Map the [-3, 3] sum to a palette index
+    acc += 3 * SIN_MAX
+    acc *= 1023
+    acc //= 6 * SIN_MAX
+    return acc
+
+def _symmetry_index(config, frame, params):
+    """Radial wave moving out from the matrix center"""
+    # Distance from center is static, so it comes precomputed from config
+    distance = config.distance_map
+    wave = config.get_scratch('fx.wave', distance.shape)
+    
+    # Create radial wave pattern
+    np.multiply(distance, config.SCALE, out=wave)
+    wave -= frame * 0.05 * config.SPEED
+    np.sin(wave, out=wave)
+    
+    # Map wave to palette position
+    wave += 1
+    wave /= 2
+    wave *= 1023
+    return _palette_index(config, wave)
+
+def _parametric_index(config, frame, params):
+    """Sum of wave_count interfering waves with a drifting hue offset"""
+    wave_count, wave_amplitude, phase_shift, color_shift, interference = params
+    
+    # Whole-matrix coordinate grids and reused work arrays
+    x, y = config.get_xy_grid()
+    wave_sum = config.get_scratch('fx.wave_sum', x.shape)
+    h_wave = config.get_scratch('fx.h_wave', x.shape)
+    v_wave = config.get_scratch('fx.v_wave', x.shape)
+    d_wave = config.get_scratch('fx.d_wave', x.shape)
+    
+    # Per-frame constants
+    speed, scale = config.SPEED, config.SCALE
+    t_h = frame * 0.02 * speed
+    t_v = frame * 0.03 * speed
+    t_d = frame * 0.025 * speed
+    
+    # Sum the wave components with a kernel specialized for these parameters
+    kernel = _get_kernel(wave_count, wave_amplitude, phase_shift, interference)
+    kernel(x, y, _diagonal(config), wave_sum, h_wave, v_wave, d_wave, t_h, t_v, t_d, scale)
+    
+    # Add time-based color shifting
+    color_time = frame * 0.01 * color_shift
+    hue_offset = math.sin(color_time) * 0.3
+    
+    # Map to palette with color shifting
+    palette_pos = wave_sum
+    palette_pos += 1
+    palette_pos /= 2
+    palette_pos += hue_offset
+    np.clip(palette_pos, 0, 1, out=palette_pos)  # Clamp to [0,1]
+    
+    palette_pos *= 1023
+    return _palette_index(config, palette_pos)
+
+_INDEX_BUILDERS = (_waves_index, _symmetry_index, _parametric_index)
+
+def render_wave(kind, pixels, config, frame, params=None):
+    """Render one frame of a wave animation kind into pixels"""
+    palette_idx = _INDEX_BUILDERS[kind](config, frame, params)
+    colors = config.get_scratch('fx.colors', palette_idx.shape + (3,), np.uint8)
+    
+    # One lookup gives the palette color with brightness, intensity and gamma applied
+    np.take(config.final_lut, palette_idx, axis=0, out=colors)
+    
+    # Write in wiring order
+    config.write_grid(pixels, colors)